@@ -9,7 +9,7 @@ mapped as (
         'humidity_indoor' as data_key,
         source."Relative_Humidity(%)" as data_value --noqa
     from source
-    inner join {{ ref('mapping_indoor') }} as mapping --noqa
+    inner join {{ source('seed_index','mapping_indoor') }} as mapping --noqa
         on source.location = mapping.sensor
     where source.datetime is not null
 ),
@@ -9,7 +9,7 @@ mapped as (
         'temp_indoor' as data_key,
         source.temperature_celsius as data_value
     from source
-    inner join {{ ref('mapping_indoor') }} as mapping --noqa
+    inner join {{ source('seed_index','mapping_indoor') }} as mapping --noqa
         on source.location = mapping.sensor
     where source.datetime is not null
 ),
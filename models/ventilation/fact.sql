@@ -1,5 +1,8 @@
 with source as ( --noqa
-    select cast(columns(*) as varchar) from {{ source('csv_google','merged') }}
+    select
+        date,
+        try_cast(columns(* exclude (date)) as double) --noqa
+    from {{ source('csv_google','merged') }}
 ),
 
 unpivoted as (
@@ -17,7 +20,7 @@ mapped as (
         mapping.data_key,
         unpivoted.data_value
     from unpivoted
-    inner join {{ ref('mapping') }} as mapping --noqa
+    inner join {{ source('seed_index','mapping') }} as mapping --noqa
         on unpivoted.data_key_original = mapping.data_key_original
     where unpivoted.date is not null
 ),
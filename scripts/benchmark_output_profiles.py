@@ -0,0 +1,76 @@
+# scripts/benchmark_output_profiles.py
+"""Porovná výstupní profily: velikost souboru, čas zápisu a čas dekódování (Parquet i CSV.gz).
+
+Data bere z Arrow snapshotu (public/sm2_hourly.arrow), pokud odpovídá vstupům,
+jinak je sestaví z ./gdrive/*.hourly.csv stejně jako build_public_dataset.py.
+
+    python3 scripts/benchmark_output_profiles.py [profil ...]
+"""
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from build_public_dataset import find_monthly_files, load_or_build_dataset
+from hourly_snapshot import to_public_frame
+from output_profiles import OUTPUT_PROFILES, get_profile, write_csv_gz, write_parquet
+
+BENCH_OUT = Path("./public/output_profiles_benchmark.json")
+
+def _timed(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+def benchmark_profile(data: pd.DataFrame, name: str, tmp_dir: Path) -> dict:
+    _, profile = get_profile(name)
+    pq_path = tmp_dir / f"{name}.parquet"
+    csv_path = tmp_dir / f"{name}.csv.gz"
+    parquet_write_s = _timed(lambda: write_parquet(data, pq_path, profile))
+    parquet_read_s = _timed(lambda: pd.read_parquet(pq_path))
+    csv_gz_write_s = _timed(lambda: write_csv_gz(data, csv_path, profile))
+    csv_gz_read_s = _timed(lambda: pd.read_csv(csv_path))
+    return {
+        "profile": name,
+        "parquet_mb": pq_path.stat().st_size / 1_048_576,
+        "parquet_write_s": parquet_write_s,
+        "parquet_read_s": parquet_read_s,
+        "csv_gz_mb": csv_path.stat().st_size / 1_048_576,
+        "csv_gz_write_s": csv_gz_write_s,
+        "csv_gz_read_s": csv_gz_read_s,
+    }
+
+def main():
+    names = sys.argv[1:] or list(OUTPUT_PROFILES)
+    files = find_monthly_files()
+    if not files:
+        print("ℹ️ Nenašel jsem žádné agregované měsíční CSV – konec.")
+        return
+    data, _ = load_or_build_dataset(files)
+    data = to_public_frame(data)
+    print(f"📊 Benchmark nad {len(data)} řádky, profily: {', '.join(names)}")
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in names:
+            r = benchmark_profile(data, name, Path(tmp))
+            results.append(r)
+            print(f"✅ {name}: hotovo")
+
+    header = f"{'profil':<16} {'parquet MB':>10} {'zápis s':>8} {'čtení s':>8} {'csv.gz MB':>10} {'zápis s':>8} {'čtení s':>8}"
+    print("\n" + header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['profile']:<16} {r['parquet_mb']:>10.2f} {r['parquet_write_s']:>8.2f} {r['parquet_read_s']:>8.2f}"
+            f" {r['csv_gz_mb']:>10.2f} {r['csv_gz_write_s']:>8.2f} {r['csv_gz_read_s']:>8.2f}"
+        )
+
+    BENCH_OUT.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(f"\n🧾 Výsledky uloženy: {BENCH_OUT}")
+
+if __name__ == "__main__":
+    main()
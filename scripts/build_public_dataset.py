@@ -6,6 +6,21 @@ from pathlib import Path
 import subprocess
 from datetime import datetime, timezone
 
+from hourly_snapshot import (
+    SNAPSHOT_FILE,
+    file_digest,
+    load_part,
+    load_snapshot,
+    read_snapshot_summary,
+    snapshot_is_current,
+    source_fingerprint,
+    to_public_frame,
+    to_snapshot_frame,
+    write_snapshot,
+)
+from output_profiles import get_profile, write_csv_gz, write_parquet
+from seed_mapping import SeedLookup, load_lookup
+
 # === Konfigurace ===
 AGG_SOURCE_REMOTE = "sm2drive:Normalized"  # odkud případně číst agregované měsíční CSV
 LOCAL_AGG_DIR = Path("./gdrive")           # kde budou additive_YYYY-MM.hourly.csv / nonadditive_YYYY-MM.hourly.csv
@@ -39,15 +54,16 @@ def find_monthly_files() -> list[str]:
         print(f"  … a dalších {len(files)-10} souborů")
     return files
 
-def load_location_map() -> dict:
+def load_location_map() -> SeedLookup | None:
     if not LOCATION_MAP_FILE.exists():
         print(f"⚠️ Mapping soubor {LOCATION_MAP_FILE} neexistuje – přemapování location se přeskočí.")
-        return {}
-    df = pd.read_csv(LOCATION_MAP_FILE, dtype=str)
-    if not {"from","to"}.issubset(df.columns):
+        return None
+    columns = pd.read_csv(LOCATION_MAP_FILE, nrows=0).columns
+    if not {"from","to"}.issubset(columns):
         print("⚠️ Mapping soubor neobsahuje sloupce 'from,to' – přemapování se přeskočí.")
-        return {}
-    mapping = dict(zip(df["from"], df["to"]))
+        return None
+    # duplicitní klíče vyhodí ValueError – build spadne místo publikace nenamapovaných location
+    mapping = load_lookup("location_map", "to")
     print(f"🔁 Načten mapping location: {len(mapping)} položek")
     return mapping
 
@@ -61,12 +77,40 @@ def load_and_align(path: str) -> pd.DataFrame:
     df["data_value"] = pd.to_numeric(df["data_value"], errors="coerce")
     return df
 
-def write_readme_and_schema(df: pd.DataFrame):
-    n_rows = len(df)
-    time_min = df["time"].min() if n_rows else None
-    time_max = df["time"].max() if n_rows else None
-    meas_counts = df["measurement"].value_counts().to_dict() if n_rows else {}
-    qty_top = df["data_key"].value_counts().head(15).to_dict() if n_rows else {}
+def build_dataset(files: list[str], digests: dict[str, str] | None = None) -> pd.DataFrame:
+    """Načte měsíční CSV (nezměněné ze snapshotů částí), přemapuje location a vrátí seřazený dataset."""
+    digests = digests or {}
+    parts = []
+    for p in files:
+        df = load_part(p, load_and_align, digests.get(p))
+        parts.append(df)
+        print(f"✅ {Path(p).name}: {len(df)} řádků")
+
+    data = pd.concat(parts, ignore_index=True)
+    location_map = load_location_map()
+    if location_map is not None:
+        data["location"] = location_map.remap(data["location"])
+    return data.sort_values(["time","location","data_key","source"]).reset_index(drop=True)
+
+def load_or_build_dataset(files: list[str]) -> tuple[pd.DataFrame, dict]:
+    """Vrátí dataset a jeho souhrn; pokud se vstupy nezměnily, použije Arrow snapshot."""
+    digests = {p: file_digest(p) for p in files}
+    fingerprint = source_fingerprint(digests, extra=[LOCATION_MAP_FILE])
+    if snapshot_is_current(fingerprint):
+        print(f"♻️ Vstupy beze změny – používám snapshot {SNAPSHOT_FILE}")
+        return load_snapshot(), read_snapshot_summary()
+
+    # stejné dtypy (kategorie) jako při načtení ze snapshotu; write_snapshot už nekopíruje
+    data = to_snapshot_frame(build_dataset(files, digests))
+    summary = write_snapshot(data, fingerprint)
+    return data, summary
+
+def write_readme_and_schema(summary: dict):
+    n_rows = summary["rows"]
+    time_min = summary["time_min"]
+    time_max = summary["time_max"]
+    meas_counts = summary["counts"].get("measurement", {})
+    qty_top = dict(list(summary["counts"].get("data_key", {}).items())[:15])
     created_utc = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%SZ")
 
     readme = f"""# SM2 Public Hourly Dataset
@@ -161,28 +205,22 @@ def main():
         print("ℹ️ Nenašel jsem žádné agregované měsíční CSV – konec.")
         return
 
-    location_map = load_location_map()
-    parts = []
-    for p in files:
-        df = load_and_align(p)
-        if location_map:
-            df["location"] = df["location"].replace(location_map)
-        parts.append(df)
-        print(f"✅ {Path(p).name}: {len(df)} řádků")
+    data, summary = load_or_build_dataset(files)
+    data = to_public_frame(data)
 
-    data = pd.concat(parts, ignore_index=True)
-    data = data.sort_values(["time","location","data_key","source"]).reset_index(drop=True)
+    profile_name, profile = get_profile()
+    print(f"⚙️ Výstupní profil: {profile_name}")
 
-    data.to_csv(OUT_CSV, index=False, compression="gzip")
+    write_csv_gz(data, OUT_CSV, profile)
     print(f"💾 Uloženo CSV: {OUT_CSV} ({OUT_CSV.stat().st_size/1_048_576:.2f} MB)")
 
     try:
-        data.to_parquet(OUT_PARQUET, index=False)
+        write_parquet(data, OUT_PARQUET, profile)
         print(f"💾 Uloženo Parquet: {OUT_PARQUET} ({OUT_PARQUET.stat().st_size/1_048_576:.2f} MB)")
     except Exception as e:
         print(f"⚠️ Parquet neuložen ({e}) – CSV stačí.")
 
-    write_readme_and_schema(data)
+    write_readme_and_schema(summary)
     upload_to_drive(OUT_CSV)
     if OUT_PARQUET.exists():
         upload_to_drive(OUT_PARQUET)
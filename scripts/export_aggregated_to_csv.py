@@ -1,7 +1,9 @@
 # scripts/export_aggregated_to_csv.py
 import os
 import subprocess
+import sys
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from io import StringIO
 
@@ -12,6 +14,8 @@ HOST  = os.getenv("INFLUX_URL", "http://localhost:8086")  # použijeme --host
 BUCKET = "sensor_data"
 EXPORT_DIR = "./gdrive"
 GDRIVE_REMOTE = "sm2drive:Normalized"  # kam pushnout agregované CSV
+MAX_CONCURRENT_SHARDS = int(os.getenv("AGG_MAX_CONCURRENCY", "4"))  # souběžné měsíční dotazy
+CHUNK_ROWS = 200_000  # po kolika řádcích se surový výstup převádí do měsíčního CSV
 
 Path(EXPORT_DIR).mkdir(parents=True, exist_ok=True)
 
@@ -93,12 +97,40 @@ from(bucket: "{BUCKET}")
     print(f"✅ Rozsah {measurement}: {min_time} → {max_time}")
     return min_time, max_time
 
-def clean_and_write_monthly(df: pd.DataFrame, measurement: str) -> list[str]:
-    """Přejmenuje sloupce, vybere požadované a uloží po měsících."""
-    if df.empty:
-        return []
+def run_query_to_file(flux_query: str, label: str, out_path: Path) -> bool:
+    """Jako run_query_file, ale stdout (CSV) streamuje rovnou do souboru místo do paměti.
 
-    # Přejmenování a výběr sloupců
+    Vrací True, pokud dotaz proběhl (returncode 0) – i když je výstup prázdný.
+    """
+    tmp_path = Path(f"tmp_{label}.flux")
+    tmp_path.write_text(flux_query, encoding="utf-8")
+
+    print(f"\n🔹 Spouštím Flux ({label}) přes --file: {tmp_path}")
+
+    try:
+        with open(out_path, "w", encoding="utf-8") as out:
+            res = subprocess.run(
+                [
+                    "influx", "query",
+                    "--org", ORG,
+                    "--token", TOKEN,
+                    "--host", HOST,
+                    "--raw",
+                    "--file", str(tmp_path),
+                ],
+                stdout=out, stderr=subprocess.PIPE, text=True
+            )
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+    print(f"🔍 STATUS CODE ({label}):", res.returncode)
+    if res.stderr.strip():
+        print(f"⚠️ STDERR ({label}):", res.stderr.strip())
+
+    return res.returncode == 0
+
+def clean_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Přejmenuje sloupce, vybere požadované a zahodí řádky bez platného času."""
     rename_map = {"_time": "time", "_value": "data_value", "_measurement": "measurement", "quantity": "data_key"}
     df = df.rename(columns=rename_map)
     needed = ["time", "location", "source", "measurement", "data_key", "data_value"]
@@ -108,67 +140,133 @@ def clean_and_write_monthly(df: pd.DataFrame, measurement: str) -> list[str]:
             df[col] = pd.NA
     df = df[needed].copy()
 
-    # Rozdělení po měsících
     df["time"] = pd.to_datetime(df["time"], errors="coerce", utc=True)
-    df = df.dropna(subset=["time"])
-    if df.empty:
-        return []
-
-    df["year_month"] = df["time"].dt.strftime("%Y-%m")
-    out_files: list[str] = []
-
-    for ym, g in df.groupby("year_month"):
-        g2 = g.drop(columns=["year_month"]).copy()
-        fname = f"{measurement}_{ym}.hourly.csv"
-        fpath = str(Path(EXPORT_DIR) / fname)
-        g2.to_csv(fpath, index=False)
-        print(f"✅ Uloženo: {fpath}")
-
-        # Upload na GDrive
-        rc = subprocess.run(["rclone", "copyto", fpath, f"{GDRIVE_REMOTE}/{fname}"],
-                            capture_output=True, text=True)
-        if rc.returncode != 0:
-            print(f"⚠️ Upload selhal pro {fname}: {rc.stderr.strip()}")
-        else:
-            print(f"☁️ Upload hotov: {GDRIVE_REMOTE}/{fname}")
-
-        out_files.append(fpath)
-
-    return out_files
-
-def export_measurement_hourly(measurement: str, fn: str) -> list[str]:
-    """Agregace 1h pro dané measurement a uložení do měsíčních CSV (čisté CSV)."""
-    print(f"\n📤 Agreguji '{measurement}' (fn: {fn}) ...")
-    t_min, t_max = get_min_max_time(measurement)
-    if not t_min or not t_max:
-        print(f"ℹ️ Measurement '{measurement}' nemá data – přeskočeno.")
-        return []
+    return df.dropna(subset=["time"])
+
+def upload_to_drive(fpath: str, fname: str):
+    rc = subprocess.run(["rclone", "copyto", fpath, f"{GDRIVE_REMOTE}/{fname}"],
+                        capture_output=True, text=True)
+    if rc.returncode != 0:
+        print(f"⚠️ Upload selhal pro {fname}: {rc.stderr.strip()}")
+    else:
+        print(f"☁️ Upload hotov: {GDRIVE_REMOTE}/{fname}")
 
+def month_shards(t_min: str, t_max: str) -> list[tuple[str, str, str]]:
+    """Rozdělí rozsah t_min..t_max na měsíční shardy (year_month, start, stop).
+
+    aggregateWindow označuje okno časem jeho konce (_time = _stop), takže do souboru
+    měsíce M patří okna končící v [začátek M, začátek M+1). Shard proto začíná hodinu
+    před začátkem měsíce a končí hodinu před začátkem dalšího; okna jsou zarovnaná
+    na celé hodiny, takže každé okno spadne celé do jediného shardu. Krajní shardy
+    používají původní t_min/t_max, aby se agregovalo stejně jako jeden celkový dotaz –
+    poslední shard končí vždy v t_max, i když t_max leží v poslední hodině měsíce
+    (okno [m_stop, t_max) je označené časem t_max, tedy stále v měsíci t_max).
+    """
+    ts_min = pd.Timestamp(t_min)
+    ts_max = pd.Timestamp(t_max)
+    hour = pd.Timedelta(hours=1)
+    last_period = ts_max.tz_localize(None).to_period("M")
+    shards = []
+    for period in pd.period_range(ts_min.tz_localize(None).to_period("M"), last_period, freq="M"):
+        m_start = pd.Timestamp(period.start_time, tz="UTC") - hour
+        m_stop = pd.Timestamp((period + 1).start_time, tz="UTC") - hour
+        start = t_min if ts_min >= m_start else m_start.strftime("%Y-%m-%dT%H:%M:%SZ")
+        stop = t_max if period == last_period else m_stop.strftime("%Y-%m-%dT%H:%M:%SZ")
+        if pd.Timestamp(start) < pd.Timestamp(stop):
+            shards.append((str(period), start, stop))
+    return shards
+
+def export_month_shard(measurement: str, fn: str, ym: str, start: str, stop: str) -> tuple[str | None, bool]:
+    """Agreguje jeden měsíc a streamuje výsledek do {measurement}_{ym}.hourly.csv.
+
+    Vrací (cesta k souboru nebo None, True pokud dotaz/čtení selhalo). Prázdný měsíc není chyba.
+    """
     q = f"""
 from(bucket: "{BUCKET}")
-  |> range(start: time(v: "{t_min}"), stop: time(v: "{t_max}"))
+  |> range(start: time(v: "{start}"), stop: time(v: "{stop}"))
   |> filter(fn: (r) => r._measurement == "{measurement}")
   |> aggregateWindow(every: 1h, fn: {fn}, createEmpty: false)
   |> keep(columns: ["_time","_value","_measurement","location","quantity","source"])
   |> yield(name: "hourly")
 """
-    out = run_query_file(q, f"{measurement}_hourly")
-    if not out:
-        print(f"⚠️ Žádný výstup pro '{measurement}'.")
-        return []
+    label = f"{measurement}_{ym}_hourly"
+    raw_path = Path(f"tmp_{label}.raw.csv")
+    fname = f"{measurement}_{ym}.hourly.csv"
+    fpath = Path(EXPORT_DIR) / fname
+    part_path = fpath.with_suffix(".csv.part")
+
+    try:
+        if not run_query_to_file(q, label, raw_path):
+            print(f"❌ Dotaz pro '{measurement}' {ym} selhal.")
+            return None, True
+
+        period = pd.Period(ym, freq="M")
+        m_start = pd.Timestamp(period.start_time, tz="UTC")
+        m_next = pd.Timestamp((period + 1).start_time, tz="UTC")
+        n_rows = 0
+        parse_error = None
+        with open(part_path, "w", encoding="utf-8", newline="") as out:
+            try:
+                for chunk in pd.read_csv(raw_path, comment="#", chunksize=CHUNK_ROWS):
+                    if "_time" not in chunk.columns:
+                        break
+                    g = clean_frame(chunk)
+                    # pojistka: do souboru jen okna, jejichž _time leží v daném měsíci
+                    g = g[(g["time"] >= m_start) & (g["time"] < m_next)]
+                    if g.empty:
+                        continue
+                    g.to_csv(out, index=False, header=(n_rows == 0))
+                    n_rows += len(g)
+            except pd.errors.EmptyDataError:
+                pass
+            except pd.errors.ParserError as e:
+                parse_error = e
+    finally:
+        raw_path.unlink(missing_ok=True)
+
+    if parse_error is not None:
+        part_path.unlink(missing_ok=True)
+        print(f"❌ Chyba při čtení CSV pro '{measurement}' {ym}: {parse_error}")
+        return None, True
+
+    if not n_rows:
+        part_path.unlink(missing_ok=True)
+        print(f"ℹ️ Výsledek pro '{measurement}' {ym} je prázdný.")
+        return None, False
 
-    df = parse_influx_csv(out)
-    if df.empty or "_time" not in df.columns:
-        print(f"⚠️ Výsledný DataFrame pro '{measurement}' je prázdný.")
-        return []
+    part_path.replace(fpath)
+    print(f"✅ Uloženo: {fpath} ({n_rows} řádků)")
+    upload_to_drive(str(fpath), fname)
+    return str(fpath), False
 
-    return clean_and_write_monthly(df, measurement)
+def export_measurement_hourly(measurement: str, fn: str) -> tuple[list[str], list[str]]:
+    """Agregace 1h pro dané measurement po měsících – každý měsíc vlastní dotaz a vlastní CSV.
+
+    Vrací (vytvořené soubory, měsíce, jejichž export selhal).
+    """
+    print(f"\n📤 Agreguji '{measurement}' (fn: {fn}) ...")
+    t_min, t_max = get_min_max_time(measurement)
+    if not t_min or not t_max:
+        print(f"ℹ️ Measurement '{measurement}' nemá data – přeskočeno.")
+        return [], []
+
+    shards = month_shards(t_min, t_max)
+    print(f"🧩 {len(shards)} měsíčních shardů, souběžně max {MAX_CONCURRENT_SHARDS}")
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_SHARDS) as pool:
+        results = list(pool.map(lambda s: export_month_shard(measurement, fn, *s), shards))
+
+    created = [p for p, _ in results if p]
+    failed = [f"{measurement}_{ym}" for (ym, _, _), (_, err) in zip(shards, results) if err]
+    return created, failed
 
 def main():
     created: list[str] = []
+    failed: list[str] = []
     # additive -> sum, nonadditive -> mean
-    created += export_measurement_hourly("additive", "sum")
-    created += export_measurement_hourly("nonadditive", "mean")
+    for measurement, fn in (("additive", "sum"), ("nonadditive", "mean")):
+        c, f = export_measurement_hourly(measurement, fn)
+        created += c
+        failed += f
 
     if not created:
         print("\nℹ️ Nebyly vytvořeny žádné soubory k uploadu.")
@@ -177,6 +275,12 @@ def main():
         for p in created:
             print("  -", p)
 
+    if failed:
+        print(f"\n❌ Export selhal pro {len(failed)} měsíců:")
+        for m in failed:
+            print("  -", m)
+        sys.exit(1)
+
 if __name__ == "__main__":
     main()
 
@@ -0,0 +1,163 @@
+# scripts/hourly_snapshot.py
+"""Arrow IPC (Feather v2) snapshot sloučeného hodinového datasetu.
+
+Snapshot se zapisuje nekomprimovaně, aby šel načíst přes memory-map bez
+kopírování. Textové sloupce jsou slovníkově kódované a souhrnné statistiky
+(počty řádků, rozsah času, četnosti measurement/data_key) jsou uložené
+v metadatech schématu – README/schema se tak generují bez čtení dat.
+
+Vstupy se porovnávají podle obsahu (sha256, stejně jako hashFiles v klíči actions/cache).
+CSV aktuálního měsíce se mění každou noc, proto má každý měsíční soubor vlastní
+snapshot (PARTS_DIR) – při nočním běhu se znovu parsuje jen změněný měsíc,
+sloučený snapshot se pak sestaví z částí.
+
+Použití pro ad-hoc analýzu:
+
+    from hourly_snapshot import load_snapshot, load_snapshot_table, read_snapshot_summary
+    df = load_snapshot()                       # pandas, kategorie
+    tbl = load_snapshot_table(columns=["time", "data_value"])
+    print(read_snapshot_summary())
+"""
+import hashlib
+import json
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc as ipc
+
+SNAPSHOT_FILE = Path("./public/sm2_hourly.arrow")
+PARTS_DIR = Path("./public/sm2_hourly_parts")
+SNAPSHOT_VERSION = "3"  # zvýšit při změně layoutu nebo souhrnu snapshotu
+
+META_FINGERPRINT = b"sm2.fingerprint"
+META_SUMMARY = b"sm2.summary"
+
+CATEGORY_COLS = ["location", "source", "measurement", "data_key"]
+COLUMNS = ["time", "location", "source", "measurement", "data_key", "data_value"]
+
+def file_digest(path: str | Path) -> str:
+    """sha256 obsahu souboru."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def source_fingerprint(digests: dict[str, str], extra: list[Path] | None = None) -> str:
+    """Otisk vstupů z obsahu: hourly CSV (jméno -> file_digest) a doplňkové soubory (seedy)."""
+    h = hashlib.sha256(f"v{SNAPSHOT_VERSION}".encode())
+    for f in sorted(digests):
+        h.update(f"{Path(f).name}|{digests[f]}\n".encode())
+    for p in extra or []:
+        h.update(p.name.encode())
+        h.update(p.read_bytes() if p.exists() else b"<missing>")
+    return h.hexdigest()
+
+def _summarize(df: pd.DataFrame, table: pa.Table) -> dict:
+    """Souhrn pro README/schema – četnosti z kódů kategorií (bincount), ne z textových hodnot.
+
+    Rozsah času se počítá přes pyarrow.compute.min_max (nezávisí na pořadí řádků, NaT se přeskočí).
+    Četnosti jsou seřazené sestupně podle počtu a při shodě podle názvu.
+    """
+    summary = {"rows": len(df), "time_min": None, "time_max": None, "counts": {}}
+    time_range = pc.min_max(table["time"])
+    if time_range["min"].is_valid:
+        summary["time_min"] = str(pd.Timestamp(time_range["min"].as_py()))
+        summary["time_max"] = str(pd.Timestamp(time_range["max"].as_py()))
+    for col in ("measurement", "data_key"):
+        cat = df[col].cat
+        codes = cat.codes.to_numpy()
+        counts = np.bincount(codes[codes >= 0], minlength=len(cat.categories))
+        items = sorted(
+            ((str(name), int(n)) for name, n in zip(cat.categories, counts) if n),
+            key=lambda kv: (-kv[1], kv[0]),
+        )
+        summary["counts"][col] = dict(items)
+    return summary
+
+def to_snapshot_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Převede sloučená data na typovaný tvar snapshotu (kategorie, UTC čas, float hodnoty).
+
+    Už typovaný DataFrame vrací beze změny (bez kopie).
+    """
+    if list(df.columns) == COLUMNS and all(isinstance(df[c].dtype, pd.CategoricalDtype) for c in CATEGORY_COLS):
+        return df
+    return df[COLUMNS].astype({col: "category" for col in CATEGORY_COLS})
+
+def to_public_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Kategorie zpět na text – veřejné CSV/Parquet mají stejné (string) schéma jako bez snapshotu."""
+    return df.assign(**{col: df[col].astype(df[col].cat.categories.dtype) for col in CATEGORY_COLS})
+
+def _write_ipc(table: pa.Table, metadata: dict, path: Path):
+    """Zapíše tabulku jako nekomprimovaný IPC soubor (atomicky přes .tmp)."""
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), **metadata})
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with pa.OSFile(str(tmp_path), "wb") as sink:
+        with ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    tmp_path.replace(path)
+
+def write_snapshot(df: pd.DataFrame, fingerprint: str, path: Path = SNAPSHOT_FILE) -> dict:
+    """Uloží typovaný dataset jako nekomprimovaný Arrow IPC soubor. Vrací souhrn uložený v metadatech."""
+    df = to_snapshot_frame(df)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    summary = _summarize(df, table)
+    _write_ipc(table, {META_FINGERPRINT: fingerprint.encode(), META_SUMMARY: json.dumps(summary).encode()}, path)
+    print(f"🗄️ Snapshot uložen: {path} ({path.stat().st_size/1_048_576:.2f} MB)")
+    return summary
+
+def load_part(
+    src: str,
+    build: Callable[[str], pd.DataFrame],
+    digest: str | None = None,
+    parts_dir: Path = PARTS_DIR,
+) -> pd.DataFrame:
+    """Data jednoho měsíčního CSV: ze snapshotu části, pokud se obsah souboru nezměnil, jinak build(src).
+
+    Část ukládá výstup build() beze změny dtypů – načtení vrátí stejný DataFrame jako nové parsování.
+    """
+    part = parts_dir / f"{Path(src).name}.arrow"
+    fingerprint = f"v{SNAPSHOT_VERSION}|{digest or file_digest(src)}"
+    if snapshot_is_current(fingerprint, part):
+        print(f"♻️ {Path(src).name}: beze změny – načteno ze snapshotu části")
+        return load_snapshot(path=part)
+    df = build(src)
+    _write_ipc(pa.Table.from_pandas(df, preserve_index=False), {META_FINGERPRINT: fingerprint.encode()}, part)
+    return df
+
+def _read_metadata(path: Path) -> dict:
+    """Přečte pouze patičku/schéma IPC souboru (bez dat)."""
+    with pa.memory_map(str(path), "r") as source:
+        return ipc.open_file(source).schema.metadata or {}
+
+def snapshot_is_current(fingerprint: str, path: Path = SNAPSHOT_FILE) -> bool:
+    """True, pokud snapshot existuje a odpovídá otisku vstupů."""
+    if not path.exists():
+        return False
+    try:
+        return _read_metadata(path).get(META_FINGERPRINT, b"").decode() == fingerprint
+    except (pa.ArrowInvalid, OSError) as e:
+        print(f"⚠️ Snapshot {path} nelze přečíst ({e}) – bude přestavěn.")
+        return False
+
+def read_snapshot_summary(path: Path = SNAPSHOT_FILE) -> dict:
+    """Souhrn (rows, time_min, time_max, counts) z metadat snapshotu."""
+    raw = _read_metadata(path).get(META_SUMMARY)
+    if raw is None:
+        raise ValueError(f"{path}: snapshot neobsahuje souhrnná metadata")
+    return json.loads(raw)
+
+def load_snapshot_table(columns: list[str] | None = None, path: Path = SNAPSHOT_FILE) -> pa.Table:
+    """Načte snapshot jako pyarrow.Table přes memory-map (zero-copy)."""
+    source = pa.memory_map(str(path), "r")
+    table = ipc.open_file(source).read_all()
+    return table.select(columns) if columns else table
+
+def load_snapshot(columns: list[str] | None = None, path: Path = SNAPSHOT_FILE) -> pd.DataFrame:
+    """Načte snapshot jako DataFrame; textové sloupce zůstávají jako kategorie."""
+    return load_snapshot_table(columns, path).to_pandas()
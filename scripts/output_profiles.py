@@ -0,0 +1,102 @@
+# scripts/output_profiles.py
+"""Profily kodeků a layoutu pro veřejné výstupy (Parquet + CSV.gz).
+
+Profil se vybírá proměnnou prostředí PUBLIC_OUTPUT_PROFILE (výchozí "default").
+Porovnání profilů (velikost, čas zápisu, čas dekódování):
+
+    python3 scripts/benchmark_output_profiles.py
+"""
+import gzip
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+STRING_COLS = ["location", "source", "measurement", "data_key"]
+CLUSTER_COLS = ["measurement", "data_key", "location", "source", "time"]
+
+# Data Explorer (docs/datex) čte Parquet přes hyparquet@1.0.0 bez dalších kompresorů –
+# umí jen snappy/nekomprimované stránky, proto "default" a "explorer" zůstávají u snappy.
+OUTPUT_PROFILES: dict[str, dict] = {
+    "default": {
+        # původní chování: pyarrow výchozí nastavení, jednovláknový gzip
+        "parquet": {},
+        "cluster_by": None,
+        "csv_gzip_level": 9,
+        "csv_workers": 1,
+    },
+    "explorer": {
+        "parquet": {
+            "compression": "snappy",
+            "use_dictionary": STRING_COLS,
+            "row_group_size": 256_000,
+        },
+        "cluster_by": CLUSTER_COLS,
+        "csv_gzip_level": 6,
+        "csv_workers": os.cpu_count() or 1,
+    },
+    "download_zstd": {
+        "parquet": {
+            "compression": "zstd",
+            "compression_level": 9,
+            "use_dictionary": STRING_COLS,
+            "use_byte_stream_split": ["data_value"],
+            "row_group_size": 1_000_000,
+        },
+        "cluster_by": CLUSTER_COLS,
+        "csv_gzip_level": 6,
+        "csv_workers": os.cpu_count() or 1,
+    },
+    "download_brotli": {
+        "parquet": {
+            "compression": "brotli",
+            "compression_level": 7,
+            "use_dictionary": STRING_COLS,
+            "use_byte_stream_split": ["data_value"],
+            "row_group_size": 1_000_000,
+        },
+        "cluster_by": CLUSTER_COLS,
+        "csv_gzip_level": 6,
+        "csv_workers": os.cpu_count() or 1,
+    },
+}
+
+CSV_BLOCK_ROWS = 200_000
+
+def get_profile(name: str | None = None) -> tuple[str, dict]:
+    """Vrátí (jméno, nastavení) profilu; jméno bere z PUBLIC_OUTPUT_PROFILE, pokud není zadané."""
+    name = name or os.getenv("PUBLIC_OUTPUT_PROFILE", "default")
+    if name not in OUTPUT_PROFILES:
+        raise ValueError(f"Neznámý výstupní profil '{name}' (dostupné: {', '.join(OUTPUT_PROFILES)})")
+    return name, OUTPUT_PROFILES[name]
+
+def write_parquet(df: pd.DataFrame, path: Path, profile: dict):
+    """Zapíše Parquet s kodekem/layoutem profilu; při clusteringu zapíše i sorting_columns."""
+    options = dict(profile["parquet"])
+    cluster_by = profile["cluster_by"]
+    if cluster_by:
+        df = df.sort_values(cluster_by, kind="stable").reset_index(drop=True)
+        options["sorting_columns"] = [pq.SortingColumn(df.columns.get_loc(c)) for c in cluster_by]
+    df.to_parquet(path, index=False, engine="pyarrow", **options)
+
+def _gzip_block(df: pd.DataFrame, header: bool, level: int) -> bytes:
+    return gzip.compress(df.to_csv(index=False, header=header).encode("utf-8"), compresslevel=level, mtime=0)
+
+def write_csv_gz(df: pd.DataFrame, path: Path, profile: dict):
+    """Zapíše CSV.gz; při csv_workers > 1 po blocích jako vícečlenný gzip (čte ho gzip/pandas/zcat)."""
+    level = profile["csv_gzip_level"]
+    workers = profile["csv_workers"]
+    if workers <= 1:
+        df.to_csv(path, index=False, compression={"method": "gzip", "compresslevel": level})
+        return
+
+    starts = range(0, max(len(df), 1), CSV_BLOCK_ROWS)
+    with ThreadPoolExecutor(max_workers=workers) as pool, open(path, "wb") as f:
+        blocks = pool.map(
+            lambda i: _gzip_block(df.iloc[i:i + CSV_BLOCK_ROWS], i == 0, level),
+            starts,
+        )
+        for block in blocks:
+            f.write(block)
@@ -52,16 +52,11 @@ with open(output_file, "w", newline='', encoding='utf-8') as f:
     writer.writerow([
         "_time","_measurement","location","source","quantity","_field","_value"
     ])
-    for _, row in merged_df.iterrows():
-        writer.writerow([
-            row["_time"],
-            "nonadditive",
-            row["location"],
-            row["source"],
-            row["quantity"],
-            row["quantity"],  # _field = quantity
-            row["_value"]
-        ])
+    # _field = quantity; na_rep/lineterminator drží formát dřívějšího csv.writer
+    merged_df["_field"] = merged_df["quantity"]
+    merged_df[[
+        "_time", "_measurement", "location", "source", "quantity", "_field", "_value"
+    ]].to_csv(f, header=False, index=False, na_rep="nan", lineterminator="\r\n")
 
 # Debug: ukázka souboru
 print("\n📄 Ukázka vygenerovaného CSV:")
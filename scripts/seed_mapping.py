@@ -0,0 +1,115 @@
+# scripts/seed_mapping.py
+"""Společná normalizace klíčů podle mapovacích seedů (seeds/*.csv) pro Python i dbt.
+
+Každý seed ze SEEDS se zkompiluje jednou: ověří se (unikátní a neprázdné klíče i hodnoty)
+a ke každému cílovému sloupci se přidá celočíselný kód do seřazeného slovníku hodnot.
+
+- Python: přemapování běží nad kategoriemi – hledá se jen v unikátních hodnotách
+  a řádky se překódují celočíselně, bez Series.replace a bez iterace po řádcích.
+
+      from seed_mapping import load_lookup
+      df["location"] = load_lookup("location_map", "to").remap(df["location"])
+
+- dbt: `python3 scripts/seed_mapping.py` zapíše zkompilované seedy do
+  target/seed_index/<seed>.csv; modely je joinují jako source('seed_index', <seed>).
+"""
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SEEDS_DIR = Path("./seeds")
+COMPILED_DIR = Path("./target/seed_index")
+
+# seed -> (sloupec klíče, cílové sloupce)
+SEEDS: dict[str, tuple[str, list[str]]] = {
+    "location_map": ("from", ["to"]),                              # build_public_dataset.py
+    "mapping": ("data_key_original", ["location", "data_key"]),    # models/ventilation/fact.sql
+    "mapping_indoor": ("sensor", ["location"]),                    # models/indoor/*.sql
+}
+
+class SeedLookup:
+    """Zkompilovaný seed: index unikátních klíčů a celočíselné kódy do seřazených cílových kategorií."""
+
+    def __init__(self, name: str, keys: pd.Series, values: pd.Series):
+        if keys.duplicated().any():
+            dup = sorted(keys[keys.duplicated()].unique())
+            raise ValueError(f"Seed '{name}': duplicitní klíče {dup}")
+        if keys.isna().any() or values.isna().any():
+            empty = sorted(keys[keys.isna() | values.isna()].fillna("<prázdný klíč>").unique())
+            raise ValueError(f"Seed '{name}': prázdný klíč nebo cílová hodnota u {empty}")
+        self.name = name
+        self.key_index = pd.Index(keys)
+        self.categories = pd.Index(values.unique()).sort_values()
+        self.codes = self.categories.get_indexer(values)
+
+    def __len__(self) -> int:
+        return len(self.key_index)
+
+    def remap(self, s: pd.Series, keep_unmapped: bool = True) -> pd.Series:
+        """Přemapuje sloupec; výsledek je kategorie se seřazenými hodnotami.
+
+        keep_unmapped=True odpovídá Series.replace (nenamapované hodnoty zůstanou),
+        keep_unmapped=False odpovídá inner joinu (nenamapované -> NaN, volající je zahodí).
+        """
+        cat = s.astype("category")
+        src = cat.cat.categories
+        hit = self.key_index.get_indexer(src)
+        target = np.full(len(src), -1)
+        target[hit >= 0] = self.codes[hit[hit >= 0]]
+        if keep_unmapped:
+            mapped = src.to_numpy(dtype=object)
+            mapped[target >= 0] = self.categories.to_numpy(dtype=object)[target[target >= 0]]
+            new_cats = pd.Index(mapped).unique().sort_values()
+            recode = new_cats.get_indexer(mapped)
+        else:
+            new_cats = self.categories
+            recode = target
+
+        # kód -1 (NaN) ukazuje na přidaný konec pole → zůstane -1, i když je recode prázdné
+        new_codes = np.append(recode, -1)[cat.cat.codes.to_numpy()]
+        return pd.Series(pd.Categorical.from_codes(new_codes, new_cats), index=s.index, name=s.name)
+
+@lru_cache(maxsize=None)
+def read_seed(name: str, seeds_dir: Path = SEEDS_DIR) -> pd.DataFrame:
+    """Načte seed jako text (klíče typu '4427' zůstanou řetězcem) a ověří sloupce."""
+    if name not in SEEDS:
+        raise ValueError(f"Neznámý seed '{name}' (dostupné: {', '.join(SEEDS)})")
+    key_col, value_cols = SEEDS[name]
+    path = seeds_dir / f"{name}.csv"
+    df = pd.read_csv(path, dtype=str, encoding="utf-8-sig")
+    missing = [c for c in [key_col, *value_cols] if c not in df.columns]
+    if missing:
+        raise ValueError(f"{path}: chybí sloupce {missing}")
+    return df
+
+@lru_cache(maxsize=None)
+def load_lookup(name: str, column: str, seeds_dir: Path = SEEDS_DIR) -> SeedLookup:
+    """Lookup klíč seedu -> cílový sloupec (výsledek se cachuje)."""
+    key_col, value_cols = SEEDS[name]
+    if column not in value_cols:
+        raise ValueError(f"Seed '{name}' nemá cílový sloupec '{column}' (dostupné: {value_cols})")
+    df = read_seed(name, seeds_dir)
+    return SeedLookup(f"{name}.{column}", df[key_col], df[column])
+
+def compile_seed(name: str, seeds_dir: Path = SEEDS_DIR) -> pd.DataFrame:
+    """Ověřený seed s kódy: <klíč>, <sloupec>, <sloupec>_code, …"""
+    key_col, value_cols = SEEDS[name]
+    df = read_seed(name, seeds_dir)
+    out = df[[key_col]].copy()
+    for col in value_cols:
+        out[col] = df[col]
+        out[f"{col}_code"] = load_lookup(name, col, seeds_dir).codes
+    return out
+
+def main():
+    COMPILED_DIR.mkdir(parents=True, exist_ok=True)
+    for name in SEEDS:
+        compiled = compile_seed(name)
+        out_path = COMPILED_DIR / f"{name}.csv"
+        compiled.to_csv(out_path, index=False)
+        print(f"🧩 Zkompilován seed {name}: {len(compiled)} klíčů -> {out_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import importlib
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def export(tmp_path, monkeypatch):
+    # modul při importu zakládá ./gdrive – ať vznikne v dočasném adresáři
+    monkeypatch.chdir(tmp_path)
+    module = importlib.import_module("export_aggregated_to_csv")
+    (tmp_path / module.EXPORT_DIR).mkdir(parents=True, exist_ok=True)
+    return module
+
+
+def _aggregate(points: pd.Series, start: str, stop: str) -> pd.Series:
+    """Napodobí range(start, stop) |> aggregateWindow(every: 1h, fn: count): _time = konec okna."""
+    start, stop = pd.Timestamp(start), pd.Timestamp(stop)
+    p = points[(points >= start) & (points < stop)]
+    return (p.dt.floor("h") + pd.Timedelta(hours=1)).clip(upper=stop).value_counts().sort_index()
+
+
+def _by_month(windows: pd.Series) -> dict:
+    return {ym: g for ym, g in windows.groupby(windows.index.strftime("%Y-%m"))}
+
+
+@pytest.mark.parametrize("t_min,t_max", [
+    ("2024-01-05T10:00:00Z", "2024-03-31T23:30:00Z"),  # t_max v poslední hodině měsíce
+    ("2024-03-31T23:00:00Z", "2024-03-31T23:59:00Z"),
+    ("2024-01-31T23:30:00Z", "2024-03-01T00:00:00Z"),
+    ("2024-01-01T00:00:00Z", "2024-02-29T23:00:00Z"),
+])
+def test_month_shards_match_single_query(export, t_min, t_max):
+    rng = np.random.default_rng(0)
+    lo, hi = pd.Timestamp(t_min), pd.Timestamp(t_max)
+    offsets = rng.integers(0, int((hi - lo).total_seconds()) + 1, 5000)
+    points = pd.Series(lo + pd.to_timedelta(np.sort(offsets), unit="s"))
+
+    expected = _by_month(_aggregate(points, t_min, t_max))
+
+    got = {}
+    for ym, start, stop in export.month_shards(t_min, t_max):
+        shard = _by_month(_aggregate(points, start, stop))
+        assert set(shard) <= {ym}
+        if ym in shard:
+            got[ym] = shard[ym]
+
+    assert got.keys() == expected.keys()
+    for ym in expected:
+        pd.testing.assert_series_equal(got[ym], expected[ym])
+
+
+def test_month_shards_last_shard_ends_at_t_max(export):
+    shards = export.month_shards("2024-01-05T10:00:00Z", "2024-03-31T23:30:00Z")
+    assert shards[-1] == ("2024-03", "2024-02-29T23:00:00Z", "2024-03-31T23:30:00Z")
+    assert export.month_shards("2024-03-31T23:00:00Z", "2024-03-31T23:59:00Z") == [
+        ("2024-03", "2024-03-31T23:00:00Z", "2024-03-31T23:59:00Z")
+    ]
+
+
+GOOD_RAW = """#group,false,false,true
+#datatype,string,long,dateTime:RFC3339,double,string,string,string,string
+#default,hourly,,,,,,,
+,result,table,_time,_value,_measurement,location,quantity,source
+,hourly,0,2024-03-01T00:00:00Z,1.5,additive,a,k,s
+,hourly,0,2024-03-01T01:00:00Z,2.5,additive,a,k,s
+"""
+
+
+def _fake_query(export, monkeypatch, raw: str):
+    def run_query_to_file(flux_query, label, out_path):
+        out_path.write_text(raw, encoding="utf-8")
+        return True
+    monkeypatch.setattr(export, "run_query_to_file", run_query_to_file)
+    monkeypatch.setattr(export, "upload_to_drive", lambda fpath, fname: None)
+
+
+def test_export_month_shard_writes_month_file(export, monkeypatch, tmp_path):
+    _fake_query(export, monkeypatch, GOOD_RAW)
+    out, failed = export.export_month_shard("additive", "sum", "2024-03", "2024-02-29T23:00:00Z", "2024-03-31T23:00:00Z")
+    assert not failed
+    df = pd.read_csv(out)
+    assert df.columns.tolist() == ["time", "location", "source", "measurement", "data_key", "data_value"]
+    assert df["data_value"].tolist() == [1.5, 2.5]
+
+
+def test_export_month_shard_parse_error_is_contained(export, monkeypatch, tmp_path):
+    bad = GOOD_RAW + ",hourly,1,2024-03-01T02:00:00Z,3.5,additive,a,k,s,extra,cols\n"
+    _fake_query(export, monkeypatch, bad)
+    out, failed = export.export_month_shard("additive", "sum", "2024-03", "2024-02-29T23:00:00Z", "2024-03-31T23:00:00Z")
+    assert out is None and failed
+    assert not list((tmp_path / "gdrive").iterdir())
+
+
+@pytest.mark.parametrize("exit_code,failed", [(0, False), (1, True)])
+def test_failed_query_differs_from_empty_month(export, monkeypatch, tmp_path, exit_code, failed):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    influx = bin_dir / "influx"
+    influx.write_text(f"#!/bin/sh\nexit {exit_code}\n")
+    influx.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+    out, err = export.export_month_shard("additive", "sum", "2024-03", "2024-02-29T23:00:00Z", "2024-03-31T23:00:00Z")
+    assert out is None
+    assert err is failed
+    assert not list(tmp_path.glob("tmp_*"))
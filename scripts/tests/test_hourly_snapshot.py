@@ -0,0 +1,84 @@
+import importlib
+
+import pandas as pd
+import pytest
+
+from hourly_snapshot import PARTS_DIR, SNAPSHOT_FILE, read_snapshot_summary, to_snapshot_frame, write_snapshot
+from seed_mapping import load_lookup, read_seed
+
+HEADER = "time,location,source,measurement,data_key,data_value\n"
+
+
+@pytest.fixture
+def build(tmp_path, monkeypatch):
+    # modul při importu zakládá ./public a cesty má relativní – vše v dočasném adresáři
+    monkeypatch.chdir(tmp_path)
+    read_seed.cache_clear()
+    load_lookup.cache_clear()
+    (tmp_path / "gdrive").mkdir()
+    (tmp_path / "seeds").mkdir()
+    (tmp_path / "seeds" / "location_map.csv").write_text("from,to\nL1,1NP-S1\nL2,1NP-S2\n")
+    (tmp_path / "gdrive" / "additive_2024-11.hourly.csv").write_text(
+        HEADER
+        + "2024-11-02T00:00:00Z,L1,Atrea,additive,temp_indoor,20.5\n"
+        + "2024-11-01T00:00:00Z,L2,Atrea,additive,temp_indoor,x\n"
+        + ",L3,Atrea,additive,co2,410\n"
+    )
+    (tmp_path / "gdrive" / "nonadditive_2024-12.hourly.csv").write_text(
+        HEADER
+        + "2024-12-01T05:00:00Z,L1,Daikin,nonadditive,power,1.5\n"
+        + "2024-12-01T04:00:00Z,L3,Daikin,nonadditive,power,2.5\n"
+    )
+    module = importlib.import_module("build_public_dataset")
+    (tmp_path / module.OUT_DIR).mkdir(parents=True, exist_ok=True)
+    return module
+
+
+def test_snapshot_hit_matches_fresh_build(build, capsys):
+    files = build.find_monthly_files()
+    fresh, fresh_summary = build.load_or_build_dataset(files)
+    hit, hit_summary = build.load_or_build_dataset(files)
+
+    assert "Vstupy beze změny" in capsys.readouterr().out
+    pd.testing.assert_frame_equal(hit, fresh)
+    assert hit_summary == fresh_summary
+    assert fresh_summary["rows"] == 5
+    assert fresh_summary["time_min"] == "2024-11-01 00:00:00+00:00"
+    assert fresh_summary["time_max"] == "2024-12-01 05:00:00+00:00"
+    assert sorted(fresh["location"].dropna().unique()) == ["1NP-S1", "1NP-S2", "L3"]
+
+
+def test_changed_month_reuses_other_parts(build, capsys, tmp_path):
+    files = build.find_monthly_files()
+    build.load_or_build_dataset(files)
+    with open(tmp_path / "gdrive" / "nonadditive_2024-12.hourly.csv", "a") as f:
+        f.write("2024-12-01T06:00:00Z,L2,Daikin,nonadditive,power,3.5\n")
+    capsys.readouterr()
+
+    partial, partial_summary = build.load_or_build_dataset(files)
+    out = capsys.readouterr().out
+    assert "additive_2024-11.hourly.csv: beze změny" in out
+    assert "nonadditive_2024-12.hourly.csv: beze změny" not in out
+
+    SNAPSHOT_FILE.unlink()
+    for part in PARTS_DIR.glob("*.arrow"):
+        part.unlink()
+    fresh, fresh_summary = build.load_or_build_dataset(files)
+    pd.testing.assert_frame_equal(partial, fresh)
+    assert partial_summary == fresh_summary == read_snapshot_summary()
+
+
+def test_write_snapshot_summary_does_not_need_sorted_rows(tmp_path):
+    df = to_snapshot_frame(pd.DataFrame({
+        "time": pd.to_datetime(["2024-12-01T00:00Z", None, "2024-10-01T00:00Z", "2024-11-01T00:00Z"], utc=True),
+        "location": ["a", "b", "a", "a"],
+        "source": ["s"] * 4,
+        "measurement": ["m", "n", "m", "m"],
+        "data_key": ["k"] * 4,
+        "data_value": [1.0, 2.0, 3.0, 4.0],
+    }))
+    summary = write_snapshot(df, "fp", tmp_path / "s.arrow")
+    assert summary["time_min"] == "2024-10-01 00:00:00+00:00"
+    assert summary["time_max"] == "2024-12-01 00:00:00+00:00"
+    assert summary["counts"]["measurement"] == {"m": 3, "n": 1}
+    assert read_snapshot_summary(tmp_path / "s.arrow") == summary
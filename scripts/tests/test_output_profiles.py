@@ -0,0 +1,38 @@
+import gzip
+
+import pandas as pd
+import pytest
+
+import output_profiles
+from output_profiles import write_csv_gz
+
+SINGLE = {"csv_gzip_level": 6, "csv_workers": 1}
+PARALLEL = {"csv_gzip_level": 6, "csv_workers": 4}
+
+
+def _frame(n: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        "time": pd.date_range("2024-11-01", periods=n, freq="h", tz="UTC"),
+        "location": [f"L{i % 3}" for i in range(n)],
+        "data_value": [i / 3 if i % 4 else None for i in range(n)],
+    })
+
+
+@pytest.mark.parametrize("n", [1, 9, 10, 11])
+def test_parallel_csv_gz_matches_single_threaded(tmp_path, monkeypatch, n):
+    monkeypatch.setattr(output_profiles, "CSV_BLOCK_ROWS", 3)
+    df = _frame(n)
+    write_csv_gz(df, tmp_path / "single.csv.gz", SINGLE)
+    write_csv_gz(df, tmp_path / "parallel.csv.gz", PARALLEL)
+
+    single = gzip.decompress((tmp_path / "single.csv.gz").read_bytes())
+    parallel = gzip.decompress((tmp_path / "parallel.csv.gz").read_bytes())
+    assert parallel == single
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / "parallel.csv.gz"), pd.read_csv(tmp_path / "single.csv.gz"))
+
+
+@pytest.mark.parametrize("profile", [SINGLE, PARALLEL])
+def test_empty_frame_keeps_header(tmp_path, profile):
+    path = tmp_path / "empty.csv.gz"
+    write_csv_gz(_frame(0), path, profile)
+    assert gzip.decompress(path.read_bytes()) == b"time,location,data_value\n"
@@ -0,0 +1,43 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from seed_mapping import SEEDS, SeedLookup, compile_seed, load_lookup
+
+
+def _lookup() -> SeedLookup:
+    return SeedLookup("t", pd.Series(["a", "b", "c"]), pd.Series(["X", "X", "Y"]))
+
+
+def test_remap_keeps_unmapped_like_replace():
+    s = pd.Series(["a", "z", "c", None, "b"])
+    expected = s.replace({"a": "X", "b": "X", "c": "Y"})
+    assert _lookup().remap(s).astype(object).tolist() == expected.tolist()
+
+
+def test_remap_drops_unmapped_like_inner_join():
+    s = pd.Series(["a", "z", "c"])
+    assert _lookup().remap(s, keep_unmapped=False).isna().tolist() == [False, True, False]
+
+
+def test_remap_all_null():
+    s = pd.Series([np.nan, np.nan], dtype=object)
+    assert _lookup().remap(s).isna().all()
+    assert _lookup().remap(s, keep_unmapped=False).isna().all()
+
+
+def test_empty_target_is_rejected():
+    with pytest.raises(ValueError, match="prázdný"):
+        SeedLookup("t", pd.Series(["a", "b"]), pd.Series(["X", np.nan]))
+
+
+def test_compile_repo_seeds():
+    seeds_dir = Path(__file__).resolve().parents[2] / "seeds"
+    for name, (key_col, value_cols) in SEEDS.items():
+        compiled = compile_seed(name, seeds_dir)
+        assert compiled[key_col].is_unique
+        for col in value_cols:
+            lookup = load_lookup(name, col, seeds_dir)
+            assert (lookup.categories[compiled[f"{col}_code"]] == compiled[col]).all()